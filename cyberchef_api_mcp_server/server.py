@@ -2,18 +2,42 @@
 # -*- coding: utf-8 -*-
 
 import os
+import copy
+import asyncio
+import hashlib
+import functools
 import httpx
+import ijson
+import orjson
 import logging
-from typing import Optional
-from pydantic import BaseModel
+from weakref import WeakKeyDictionary
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
+from typing_extensions import NotRequired, TypedDict
 from mcp.server.fastmcp import FastMCP
 from cyberchef_api_mcp_server.cyberchefoperations import CyberChefOperations
 
 log = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Shared clients keyed by event loop - pooled connections are bound to the loop
+# that opened them, so a client may only be reused from its own loop
+_clients: WeakKeyDictionary = WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def _lifespan(_server: FastMCP):
+    """Close the serving loop's client, and its pooled connections, on shutdown"""
+    try:
+        yield
+    finally:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
 # Create an MCP server
-mcp = FastMCP("CyberChef API MCP Server")
+mcp = FastMCP("CyberChef API MCP Server", lifespan=_lifespan)
 
 # Determine the CyberChef API URL
 cyberchef_api_url = os.getenv("CYBERCHEF_API_URL")
@@ -22,55 +46,153 @@ if cyberchef_api_url is None:
     cyberchef_api_url = "http://localhost:3000/"
 
 
-class CyberChefRecipeOperation(BaseModel):
-    """Model for a recipe operation with or without arguments"""
+def _get_client() -> httpx.AsyncClient:
+    """
+    Get the shared async client for the running event loop, creating it on first use
+
+    Concurrent tool invocations on the same loop reuse pooled keep-alive
+    connections; the transport retries connection failures over the pool before
+    they surface as errors
+
+    :return: the client bound to the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            base_url=cyberchef_api_url,
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json"
+            },
+            timeout=30.0,
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40, keepalive_expiry=60.0)
+            )
+        )
+        _clients[loop] = client
+    return client
+
+
+def _cache_size_from_env() -> int:
+    """Read the bake cache size from CYBERCHEF_CACHE_SIZE, defaulting to 1024"""
+    return int(os.getenv("CYBERCHEF_CACHE_SIZE", "1024"))
+
+
+# Recipes are deterministic functions of their inputs, so bake responses can be
+# cached; the cache is LRU-bounded and tunable via CYBERCHEF_CACHE_SIZE
+_bake_cache_size = _cache_size_from_env()
+_bake_cache: OrderedDict = OrderedDict()
+
+
+def _bake_cache_key(input_data: str, api_recipe: list) -> bytes:
+    """
+    Build a stable cache key for a bake request
+
+    :param input_data: the input data for the bake request
+    :param api_recipe: the recipe in API format
+    :return: digest identifying the (input, recipe) pair
+    """
+    key_data = orjson.dumps({"i": input_data, "r": api_recipe}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(key_data).digest()
+
+
+class CyberChefRecipeOperation(TypedDict):
+    """Schema for a recipe operation with or without arguments
+
+    A plain TypedDict skips pydantic's per-field validation machinery on every
+    tool call while FastMCP still derives the same JSON schema from it
+    """
     op: str
-    args: Optional[list] = None
+    args: NotRequired[list]
+
+
+def _recipe_key(recipe: list[CyberChefRecipeOperation]) -> tuple:
+    """
+    Flatten a recipe into a hashable tuple of (op, args) pairs for caching
+
+    :param recipe: list of CyberChefRecipeOperation objects
+    :return: tuple of (op, args) pairs
+    """
+    return tuple((op["op"], tuple(op["args"]) if op.get("args") else ()) for op in recipe)
+
+
+@functools.lru_cache(maxsize=256)
+def _convert_recipe_key_to_api_format(recipe_key: tuple) -> tuple:
+    """
+    Convert a flattened recipe key to the format expected by the CyberChef API
+
+    Results are cached so repeat calls with the same recipe (common agent
+    workflow - same recipe, many inputs) skip the conversion entirely
+
+    :param recipe_key: tuple of (op, args) pairs from _recipe_key
+    :return: recipe in API format
+    """
+    # Convert to API format in a single pass, tracking whether any op has args
+    api_recipe = []
+    has_any_args = False
+    for op_name, args in recipe_key:
+        op_dict = {"op": op_name}
+
+        # Only include args if they exist and are not empty - the API treats
+        # all args as a positional array
+        if args:
+            has_any_args = True
+            op_dict["args"] = list(args)
+
+        api_recipe.append(op_dict)
+
+    # If no operation had args, return simple operation names
+    if not has_any_args:
+        return tuple(op_dict["op"] for op_dict in api_recipe)
+
+    return tuple(api_recipe)
 
 
 def convert_recipe_to_api_format(recipe: list[CyberChefRecipeOperation]) -> list:
     """
     Convert CyberChefRecipeOperation objects to the format expected by the CyberChef API
-    
+
     The API supports multiple formats:
     - Simple operation name as string: "To Hex"
     - Operation with args object: {"op": "To Hex", "args": {"delimiter": "Colon"}}
     - Operation with args array: {"op": "To Morse Code", "args": ["Dash/Dot", "Backslash", "Comma"]}
     - Array of operation names: ["to decimal", "MD5", "to braille"]
-    
+
     :param recipe: list of CyberChefRecipeOperation objects
     :return: recipe in API format
     """
     if not recipe:
         return []
-    
-    # If all operations have no args, return simple operation names
-    if all(not op.args or len(op.args) == 0 for op in recipe):
-        return [op.op for op in recipe]
-    
-    # Convert to API format with proper args handling
-    api_recipe = []
-    for op in recipe:
-        op_dict = {"op": op.op}
-        
-        # Only include args if they exist and are not empty
-        if op.args and len(op.args) > 0:
-            # Check if args look like they should be positional (simple values)
-            # or named (dicts or complex objects)
-            if len(op.args) == 1 and not isinstance(op.args[0], (dict, list)):
-                # Single simple argument, could be positional or named
-                # We'll try positional first (array format)
-                op_dict["args"] = op.args
-            else:
-                # Multiple arguments or complex argument - use as positional array
-                op_dict["args"] = op.args
-        
-        api_recipe.append(op_dict)
-    
-    return api_recipe
+
+    recipe_key = _recipe_key(recipe)
+    try:
+        return list(_convert_recipe_key_to_api_format(recipe_key))
+    except TypeError:
+        # Args containing dicts or nested lists are unhashable, convert uncached
+        return list(_convert_recipe_key_to_api_format.__wrapped__(recipe_key))
+
+
+def _http_error_response(http_exc: httpx.HTTPStatusError) -> dict:
+    """
+    Build the error dict for an HTTP status error, preferring the API's own message
+
+    :param http_exc: status error raised by raise_for_status
+    :return: dict object of error data
+    """
+    message = str(http_exc)
+    try:
+        error_data = orjson.loads(http_exc.response.content)
+        if isinstance(error_data, dict):
+            message = error_data.get("message", message)
+    except (ValueError, TypeError):
+        pass
+    return {"error": f"HTTP {http_exc.response.status_code}: {message}"}
 
 
-def create_api_request(endpoint: str, request_data: dict) -> dict:
+async def create_api_request(endpoint: str, request_data: dict) -> dict:
     """
     Send a POST request to one of the CyberChef API endpoints to process request data and retrieve the response
 
@@ -79,39 +201,131 @@ def create_api_request(endpoint: str, request_data: dict) -> dict:
     :return: dict object of response data
     """
     api_url = f"{cyberchef_api_url}{endpoint}"
-    request_headers = {
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    }
 
     try:
-        log.info(f"Attempting to send POST request to {api_url}")
-        log.info(f"Request data: {request_data}")
-        response = httpx.post(
-            url=api_url,
-            headers=request_headers,
-            json=request_data,
-            timeout=30.0
-        )
+        log.info("Attempting to send POST request to %s", api_url)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Request data: %r", request_data)
+        client = _get_client()
+        request_content = orjson.dumps(request_data)
+        # All the endpoints are idempotent, so retry 5xx responses with backoff
+        for attempt in range(3):
+            response = await client.post(url=endpoint, content=request_content)
+            if 500 <= response.status_code < 600 and attempt < 2:
+                log.warning("HTTP %s from %s, retrying", response.status_code, api_url)
+                await asyncio.sleep(0.1 * 2 ** attempt)
+                continue
+            break
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except httpx.HTTPStatusError as http_exc:
         log.error(f"HTTP error {http_exc.response.status_code} during POST request to {api_url} - {http_exc}")
-        try:
-            error_data = http_exc.response.json()
-            return {"error": f"HTTP {http_exc.response.status_code}: {error_data.get('message', str(http_exc))}"}
-        except:
-            return {"error": f"HTTP {http_exc.response.status_code}: {str(http_exc)}"}
+        return _http_error_response(http_exc)
     except httpx.RequestError as req_exc:
         log.error(f"Exception raised during HTTP POST request to {api_url} - {req_exc}")
         return {"error": f"Exception raised during HTTP POST request to {api_url} - {req_exc}"}
 
 
+# Shared instance for the resource handlers below
+_cyberchef_ops = CyberChefOperations()
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_categories() -> list:
+    """Fetch the category list once and memoize it - categories never change at runtime"""
+    return _cyberchef_ops.get_all_categories()
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_operations_by_category(category: str) -> list:
+    """Fetch and memoize the operations for a category"""
+    return _cyberchef_ops.get_operations_by_category(category=category)
+
+
+async def _stream_batch_request(endpoint: str, request_data: dict):
+    """
+    Send a POST request to a batch endpoint and incrementally decode the JSON array response
+
+    Items are parsed and byteArray values decoded as the body streams in, so the
+    full response is never held as both raw JSON and decoded objects; if the
+    connection is interrupted mid-stream the items parsed so far are returned.
+    A 2xx body that is not a JSON array (e.g. an error object) is buffered and
+    returned as the parsed object instead
+
+    :param endpoint: API endpoint to retrieve data from
+    :param request_data: data to send with the POST request
+    :return: list of decoded response objects, or a dict object of error data
+    """
+    api_url = f"{cyberchef_api_url}{endpoint}"
+    results = []
+    incoming = ijson.sendable_list()
+    coro = ijson.items_coro(incoming, "item")
+
+    try:
+        log.info("Attempting to send POST request to %s", api_url)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Request data: %r", request_data)
+        async with _get_client().stream("POST", endpoint, content=orjson.dumps(request_data)) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                response.raise_for_status()
+            is_array = None
+            buffered = bytearray()
+            async for chunk in response.aiter_bytes():
+                # Peek at the first non-whitespace byte to tell arrays apart
+                # from plain objects, which get buffered and parsed whole
+                if is_array is None:
+                    stripped = chunk.lstrip()
+                    if not stripped:
+                        continue
+                    is_array = stripped[:1] == b"["
+                if is_array:
+                    coro.send(chunk)
+                    for item in incoming:
+                        results.append(_maybe_decode(item) if isinstance(item, dict) else item)
+                    del incoming[:]
+                else:
+                    buffered.extend(chunk)
+            if is_array is False:
+                return orjson.loads(bytes(buffered))
+        return results
+    except httpx.HTTPStatusError as http_exc:
+        log.error(f"HTTP error {http_exc.response.status_code} during POST request to {api_url} - {http_exc}")
+        return _http_error_response(http_exc)
+    except (httpx.RequestError, ijson.IncompleteJSONError) as req_exc:
+        log.error(f"Exception raised during HTTP POST request to {api_url} - {req_exc}")
+        if results:
+            log.warning("Returning %d partially streamed batch results", len(results))
+            return results
+        return {"error": f"Exception raised during HTTP POST request to {api_url} - {req_exc}"}
+    finally:
+        # Always close the parser coroutine; a truncated document raises
+        # IncompleteJSONError on close, which must not mask the real error
+        with suppress(ijson.IncompleteJSONError):
+            coro.close()
+
+
+def _maybe_decode(response_data: dict) -> dict:
+    """
+    Decode a byteArray response value to a string in place
+
+    :param response_data: single response object from the CyberChef API
+    :return: the response object with any byteArray value decoded
+    """
+    if response_data.get("type") == "byteArray":
+        try:
+            # Only servers that ignore the requested outputType return a list of ints
+            response_data["value"] = bytes(response_data["value"]).decode("utf-8", errors="replace")
+            response_data["type"] = "string"
+        except (ValueError, TypeError) as e:
+            log.warning(f"Could not decode byte array: {e}")
+    return response_data
+
+
 @mcp.resource("data://cyberchef-operations-categories")
 def get_cyberchef_operations_categories() -> list:
     """Get updated Cyber Chef categories for additional context / selection of the correct operations"""
-    cyberchef_ops = CyberChefOperations()
-    return cyberchef_ops.get_all_categories()
+    return list(_cached_categories())
 
 
 @mcp.resource("data://cyberchef-operations-by-category/{category}")
@@ -122,44 +336,52 @@ def get_cyberchef_operation_by_category(category: str) -> list:
     :param category: cyber chef category to get operations for
     :return:
     """
-    cyberchef_ops = CyberChefOperations()
-    return cyberchef_ops.get_operations_by_category(category=category)
+    return list(_cached_operations_by_category(category))
 
 
 @mcp.tool()
-def bake_recipe(input_data: str, recipe: list[CyberChefRecipeOperation]) -> dict:
+async def bake_recipe(input_data: str, recipe: list[CyberChefRecipeOperation]) -> dict:
     """
     Bake (execute) a recipe (a list of operations) in order to derive an outcome from the input data
 
     :param input_data: the data in which to perform the recipe operation(s) on
-    :param recipe: a pydantic model of operations to 'bake'/execute on the input data
+    :param recipe: a list of operations to 'bake'/execute on the input data
     :return:
     """
     # Convert recipe to API format
     api_recipe = convert_recipe_to_api_format(recipe)
-    
+
+    # Return a cached response for a previously baked (input, recipe) pair
+    cache_key = _bake_cache_key(input_data, api_recipe)
+    if cache_key in _bake_cache:
+        _bake_cache.move_to_end(cache_key)
+        return copy.deepcopy(_bake_cache[cache_key])
+
     request_data = {
         "input": input_data,
-        "recipe": api_recipe
+        "recipe": api_recipe,
+        # Ask for string output so byteArray results convert server-side instead
+        # of arriving as a list of JSON ints; servers without the option still
+        # work via the _maybe_decode fallback
+        "outputType": "string"
     }
-    log.info(f"Sending bake request with recipe: {api_recipe}")
-    response_data = create_api_request(endpoint="bake", request_data=request_data)
+    log.info("Sending bake request with recipe: %s", api_recipe)
+    response_data = await create_api_request(endpoint="bake", request_data=request_data)
 
     # If the response has a byte array, decode and return
-    data_type = response_data.get("type")
-    if data_type is not None and data_type == "byteArray":
-        try:
-            decoded_value = bytes(response_data["value"]).decode()
-            response_data["value"] = decoded_value
-            response_data["type"] = "string"
-        except (ValueError, TypeError) as e:
-            log.warning(f"Could not decode byte array: {e}")
-            
+    _maybe_decode(response_data)
+
+    # Cache successful responses only, evicting the least recently used entry
+    if not response_data.get("error"):
+        _bake_cache[cache_key] = copy.deepcopy(response_data)
+        if len(_bake_cache) > _bake_cache_size:
+            _bake_cache.popitem(last=False)
+
     return response_data
 
 
 @mcp.tool()
-def batch_bake_recipe(batch_input_data: list[str], recipe: list[CyberChefRecipeOperation]) -> dict:
+async def batch_bake_recipe(batch_input_data: list[str], recipe: list[CyberChefRecipeOperation]) -> dict:
     """
     Bake (execute) a recipe (a list of operations) in order to derive an outcome from a batch of input data
 
@@ -172,28 +394,17 @@ def batch_bake_recipe(batch_input_data: list[str], recipe: list[CyberChefRecipeO
     
     request_data = {
         "input": batch_input_data,
-        "recipe": api_recipe
+        "recipe": api_recipe,
+        "outputType": "string"
     }
-    log.info(f"Sending batch bake request with recipe: {api_recipe}")
-    response_data = create_api_request(endpoint="batch/bake", request_data=request_data)
-
-    # If any of the responses have a byte array, decode and return
-    if isinstance(response_data, list):
-        for response in response_data:
-            data_type = response.get("type")
-            if data_type is not None and data_type == "byteArray":
-                try:
-                    decoded_value = bytes(response["value"]).decode()
-                    response["value"] = decoded_value
-                    response["type"] = "string"
-                except (ValueError, TypeError) as e:
-                    log.warning(f"Could not decode byte array: {e}")
+    log.info("Sending batch bake request with recipe: %s", api_recipe)
 
-    return response_data
+    # Stream the response so items are decoded as they arrive, byte arrays included
+    return await _stream_batch_request(endpoint="batch/bake", request_data=request_data)
 
 
 @mcp.tool()
-def perform_magic_operation(
+async def perform_magic_operation(
         input_data: str,
         depth: int = 3,
         intensive_mode: bool = False,
@@ -220,7 +431,7 @@ def perform_magic_operation(
             "crib": crib_str
         }
     }
-    return create_api_request(endpoint="magic", request_data=request_data)
+    return await create_api_request(endpoint="magic", request_data=request_data)
 
 
 def main():
@@ -1,18 +1,37 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import copy
+import asyncio
+from collections import OrderedDict
+
+from cyberchef_api_mcp_server import server
 from cyberchef_api_mcp_server.server import (
-    bake_recipe, batch_bake_recipe, perform_magic_operation, CyberChefRecipeOperation
+    bake_recipe, batch_bake_recipe, perform_magic_operation, CyberChefRecipeOperation,
+    convert_recipe_to_api_format, _cache_size_from_env, _maybe_decode
 )
 
 
+def _stub_bake_api(monkeypatch, response):
+    """Swap create_api_request for a stub and isolate the bake cache, returning the call log"""
+    calls = []
+
+    async def stub(endpoint, request_data):
+        calls.append(request_data)
+        return copy.deepcopy(response)
+
+    monkeypatch.setattr(server, "create_api_request", stub)
+    monkeypatch.setattr(server, "_bake_cache", OrderedDict())
+    return calls
+
+
 def test_bake_recipe():
     test_input = "64 47 56 7a 64 41 3d 3d"
     test_recipe = [
         CyberChefRecipeOperation(op="From Hex", args=["Auto"]),
         CyberChefRecipeOperation(op="From Base64")
     ]
-    recipe_response = bake_recipe(input_data=test_input, recipe=test_recipe)
+    recipe_response = asyncio.run(bake_recipe(input_data=test_input, recipe=test_recipe))
 
     assert recipe_response["value"] == "test"
 
@@ -26,7 +45,7 @@ def test_batch_bake_recipe():
         CyberChefRecipeOperation(op="From Hex", args=["Auto"]),
         CyberChefRecipeOperation(op="From Base64")
     ]
-    recipe_response = batch_bake_recipe(batch_input_data=test_input, recipe=test_recipe)
+    recipe_response = asyncio.run(batch_bake_recipe(batch_input_data=test_input, recipe=test_recipe))
     recipe_response_parse = [value.get("value") for value in recipe_response]
 
     assert recipe_response_parse == ["test", "test2"]
@@ -34,8 +53,95 @@ def test_batch_bake_recipe():
 
 def test_perform_magic_operation():
     test_input = "64 47 56 7a 64 41 3d 3d"
-    recipe_response = perform_magic_operation(input_data=test_input)
+    recipe_response = asyncio.run(perform_magic_operation(input_data=test_input))
 
     assert recipe_response["value"][0]["data"] == "test"
     assert recipe_response["value"][1]["data"] == "dGVzdA=="
     assert recipe_response["value"][2]["data"] == test_input
+
+
+def test_bake_recipe_caches_identical_requests(monkeypatch):
+    calls = _stub_bake_api(monkeypatch, {"type": "string", "value": "test"})
+    test_recipe = [CyberChefRecipeOperation(op="From Base64")]
+
+    first = asyncio.run(bake_recipe(input_data="dGVzdA==", recipe=test_recipe))
+    second = asyncio.run(bake_recipe(input_data="dGVzdA==", recipe=test_recipe))
+
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_bake_recipe_cache_returns_copies(monkeypatch):
+    _stub_bake_api(monkeypatch, {"type": "string", "value": "test"})
+    test_recipe = [CyberChefRecipeOperation(op="From Base64")]
+
+    first = asyncio.run(bake_recipe(input_data="dGVzdA==", recipe=test_recipe))
+    first["value"] = "mutated"
+    second = asyncio.run(bake_recipe(input_data="dGVzdA==", recipe=test_recipe))
+
+    assert second["value"] == "test"
+
+
+def test_bake_recipe_cache_skips_errors(monkeypatch):
+    calls = _stub_bake_api(monkeypatch, {"error": "HTTP 500: internal error"})
+    test_recipe = [CyberChefRecipeOperation(op="From Base64")]
+
+    asyncio.run(bake_recipe(input_data="dGVzdA==", recipe=test_recipe))
+    asyncio.run(bake_recipe(input_data="dGVzdA==", recipe=test_recipe))
+
+    assert len(calls) == 2
+
+
+def test_bake_recipe_cache_evicts_least_recently_used(monkeypatch):
+    calls = _stub_bake_api(monkeypatch, {"type": "string", "value": "test"})
+    monkeypatch.setattr(server, "_bake_cache_size", 1)
+    test_recipe = [CyberChefRecipeOperation(op="From Base64")]
+
+    asyncio.run(bake_recipe(input_data="first", recipe=test_recipe))
+    asyncio.run(bake_recipe(input_data="second", recipe=test_recipe))
+    asyncio.run(bake_recipe(input_data="first", recipe=test_recipe))
+
+    assert len(calls) == 3
+
+
+def test_cache_size_from_env(monkeypatch):
+    monkeypatch.delenv("CYBERCHEF_CACHE_SIZE", raising=False)
+    assert _cache_size_from_env() == 1024
+
+    monkeypatch.setenv("CYBERCHEF_CACHE_SIZE", "16")
+    assert _cache_size_from_env() == 16
+
+
+def test_maybe_decode_int_list():
+    response = {"type": "byteArray", "value": [116, 101, 115, 116]}
+    assert _maybe_decode(response) == {"type": "string", "value": "test"}
+
+
+def test_maybe_decode_invalid_value_left_untouched():
+    response = {"type": "byteArray", "value": [300, 400]}
+    assert _maybe_decode(response)["type"] == "byteArray"
+
+
+def test_maybe_decode_ignores_other_types():
+    response = {"type": "string", "value": "test"}
+    assert _maybe_decode(response) == {"type": "string", "value": "test"}
+
+
+def test_convert_recipe_to_api_format():
+    assert convert_recipe_to_api_format([]) == []
+    assert convert_recipe_to_api_format([
+        CyberChefRecipeOperation(op="MD5"),
+        CyberChefRecipeOperation(op="To Hex")
+    ]) == ["MD5", "To Hex"]
+    assert convert_recipe_to_api_format([
+        CyberChefRecipeOperation(op="From Hex", args=["Auto"]),
+        CyberChefRecipeOperation(op="From Base64")
+    ]) == [{"op": "From Hex", "args": ["Auto"]}, {"op": "From Base64"}]
+
+
+def test_convert_recipe_unhashable_args_fall_back_uncached():
+    recipe = [CyberChefRecipeOperation(op="Fork", args=[{"delimiter": "\\n"}, ["nested"]])]
+    expected = [{"op": "Fork", "args": [{"delimiter": "\\n"}, ["nested"]]}]
+
+    assert convert_recipe_to_api_format(recipe) == expected
+    assert convert_recipe_to_api_format(recipe) == expected